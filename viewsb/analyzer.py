@@ -170,6 +170,16 @@ class ViewSBAnalyzer:
 
         except queue.Empty:
             # If no packets were available, return without error; we'll wait again next time.
+            return
+
+        # Once we have at least one packet, drain anything else the backend has
+        # already buffered without blocking. This moves whole batches through
+        # each analysis pass, so the packets we forward to the frontend
+        # accumulate into real batches rather than going out one at a time.
+        try:
+            while True:
+                self.analysis_queue.put(self.backend.read_packet(blocking=False))
+        except queue.Empty:
             pass
 
 
@@ -184,6 +194,10 @@ class ViewSBAnalyzer:
         This queries the backend for packets -once-, and then analyzes them.
         """
         self.process_analysis_queue()
+
+        # Send any packets analyzed this pass to the frontend as a single batch.
+        self.frontend.flush_packets()
+
         self.fetch_backend_packets()
 
 
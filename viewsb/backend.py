@@ -21,6 +21,10 @@ class ViewSBBackendProcess(ProcessManager):
 class ViewSBBackend(ViewSBEnumerableFromUI):
     """ Generic parent class for sources that capture USB data. """
 
+    # The maximum number of emitted packets allowed to accumulate before a
+    # batch is forced across the process boundary.
+    PACKET_BATCH_SIZE = 256
+
 
     def __init__(self):
         """
@@ -35,6 +39,10 @@ class ViewSBBackend(ViewSBEnumerableFromUI):
 
         self.packet_sequence = 1
 
+        # Emitted packets awaiting transfer; batching amortizes the per-item
+        # pickling and locking cost of the output queue.
+        self._outgoing_packets = []
+
 
     def set_up_ipc(self, output_queue, setup_queue, ready, termination_event, exception_conn):
         """
@@ -70,7 +78,20 @@ class ViewSBBackend(ViewSBEnumerableFromUI):
         packet.sequence = self.packet_sequence
         self.packet_sequence += 1
 
-        self.output_queue.put(packet)
+        self._outgoing_packets.append(packet)
+
+        # If we've accumulated a full batch, send it onwards now; otherwise it
+        # will be flushed at the end of the current capture iteration.
+        if len(self._outgoing_packets) >= self.PACKET_BATCH_SIZE:
+            self.flush_packets()
+
+
+    def flush_packets(self):
+        """ Sends any accumulated packets onward to the analyzer as a single batch. """
+
+        if self._outgoing_packets:
+            self.output_queue.put(self._outgoing_packets)
+            self._outgoing_packets = []
 
 
     def run(self):
@@ -87,9 +108,16 @@ class ViewSBBackend(ViewSBEnumerableFromUI):
         while not self.termination_event.is_set():
             self.run_capture()
 
+            # Pass on anything captured this iteration, so packets never sit
+            # in our batch buffer while the capture is quiet.
+            self.flush_packets()
+
         # Allow the backend to handle any data still pending on termination.
         self.handle_termination()
 
+        # Send any final packets onwards before we wind down.
+        self.flush_packets()
+
 
     def handle_termination(self):
         """ Called once the capture is terminated; gives the backend the ability to capture any remaining data. """
@@ -136,6 +136,18 @@ class OpenVizslaBackend(ViewSBBackend):
         self.ov_device.open(reconfigure_fpga=True)
 
 
+    def _should_halt(self, _):
+        """ Periodic callback from the capture loop; checks for termination. """
+
+        # The capture loop polls us regularly whether or not packets are arriving,
+        # which makes this our chance to push any partially-filled packet batch
+        # onward; without this, a quiet capture would display nothing until a
+        # full batch of packets accumulated.
+        self.flush_packets()
+
+        return self.termination_event.is_set()
+
+
     def run(self):
         """ Run an OpenVizsla capture. """
 
@@ -143,9 +155,11 @@ class OpenVizslaBackend(ViewSBBackend):
         self.ready.set()
 
         try:
-            halt_callback = lambda _ : self.termination_event.is_set()
-            self.ov_device.run_capture(self.capture_speed, halt_callback=halt_callback)
+            self.ov_device.run_capture(self.capture_speed, halt_callback=self._should_halt)
 
         finally:
             self.ov_device.ensure_capture_stopped()
             self.ov_device.close()
+
+            # Send any final packets onwards before we wind down.
+            self.flush_packets()
@@ -142,6 +142,18 @@ class PhyWhispererBackend(ViewSBBackend):
         self.timeout = timeout
 
 
+    def _should_halt(self, _):
+        """ Periodic callback from the capture loop; checks for termination. """
+
+        # The capture loop polls us regularly whether or not packets are arriving,
+        # which makes this our chance to push any partially-filled packet batch
+        # onward; without this, a quiet capture would display nothing until a
+        # full batch of packets accumulated.
+        self.flush_packets()
+
+        return self.termination_event.is_set()
+
+
     def run(self):
         """ Run a PhyWhisperer capture. """
 
@@ -150,8 +162,10 @@ class PhyWhispererBackend(ViewSBBackend):
         self.pw_device.con(program_fpga=True)
 
         try:
-            halt_callback = lambda _ : self.termination_event.is_set()
-            self.pw_device.run_capture(size=self.size, burst=self.burst, pattern=self.pattern, mask=self.mask, timeout=self.timeout, halt_callback=halt_callback)
+            self.pw_device.run_capture(size=self.size, burst=self.burst, pattern=self.pattern, mask=self.mask, timeout=self.timeout, halt_callback=self._should_halt)
 
         finally:
             self.pw_device.close()
+
+            # Send any final packets onwards before we wind down.
+            self.flush_packets()
@@ -307,6 +307,12 @@ class Rhododendron(ViewSBBackend):
                 else:
                     raise IOError("communications failure!")
 
+            # Push any partially-filled packet batch onward each iteration; the
+            # device read above times out regularly, so this runs even when the
+            # bus is quiet, and a slow capture never sits invisible waiting for
+            # a full batch to accumulate.
+            self.flush_packets()
+
 
 
     def run(self):
@@ -324,6 +330,9 @@ class Rhododendron(ViewSBBackend):
         finally:
             self.device.apis.usb_analyzer.stop_capture()
 
+            # Send any final packets onwards before we wind down.
+            self.flush_packets()
+
 
 
 
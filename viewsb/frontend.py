@@ -7,6 +7,7 @@ This file is part of ViewSB
 
 import sys
 import queue
+import collections
 
 from .ipc import ProcessManager
 
@@ -141,6 +142,11 @@ class ViewSBFrontend(ViewSBEnumerableFromUI):
 
     PACKET_READ_TIMEOUT = 0.01
 
+    # The maximum number of packets drained from the analyzer per
+    # handle_communications() call; bounding this keeps the UI responsive
+    # even when the analyzer is producing packets faster than we can show them.
+    MAX_PACKETS_PER_COMMUNICATION = 1024
+
     def __init__(self):
         """
         Function that initializes the relevant frontend. In most cases, this objects won't be instantiated
@@ -154,6 +160,10 @@ class ViewSBFrontend(ViewSBEnumerableFromUI):
         self._exception_conn     = None
         self.stdin               = None
 
+        # Packets from a previously-received batch that haven't been handed
+        # out yet; the analyzer sends packets across in batches.
+        self._incoming_packets = collections.deque()
+
 
     def set_up_ipc(self, data_queue, backend_setup_queue, backend_ready, termination_event, exception_conn):
         """
@@ -187,7 +197,21 @@ class ViewSBFrontend(ViewSBEnumerableFromUI):
             blocking -- If set, the read will block until a packet is available.
             timeout -- The longest time to wait on a blocking read, in floating-point seconds.
         """
-        return self.data_queue.get(blocking, timeout=timeout)
+
+        # If we have packets left over from a previously-received batch, hand
+        # one of those out before touching the queue.
+        if self._incoming_packets:
+            return self._incoming_packets.popleft()
+
+        # For non-blocking reads, use the get_nowait fast path, which skips the
+        # timeout machinery entirely.
+        if not blocking:
+            batch = self.data_queue.get_nowait()
+        else:
+            batch = self.data_queue.get(True, timeout=timeout)
+
+        self._incoming_packets.extend(batch)
+        return self._incoming_packets.popleft()
 
 
     def handle_events(self):
@@ -220,14 +244,14 @@ class ViewSBFrontend(ViewSBEnumerableFromUI):
         if you override run(). it's your responsibility to call this function.
         """
 
-        packet = True
-
-        while packet:
+        # Drain packets non-blockingly, up to our per-call bound; any remaining
+        # packets will be picked up on the next call.
+        for _ in range(self.MAX_PACKETS_PER_COMMUNICATION):
 
             # Try to fetch a packet from the analyzer.
             packet = self.fetch_packet_from_analyzer()
 
-            # If we got one, handle using it in our UI.
+            # If we're out of packets, we're done for this pass.
             if not packet:
                 break
 
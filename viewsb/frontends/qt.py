@@ -513,11 +513,12 @@ class QtFrontend(ViewSBFrontend):
 
         try:
 
-            # Get as many packets as we can as quick as we can.
+            # Get as many packets as we can as quick as we can; the analyzer
+            # sends packets across in batches.
             while True:
 
-                packet = self.data_queue.get_nowait()
-                packet_list.append(packet)
+                batch = self.data_queue.get_nowait()
+                packet_list.extend(batch)
 
         # But the instant it's empty, don't wait for any more; just send them to be processed.
         except multiprocessing.queues.Empty:
@@ -5,8 +5,10 @@ Quick experiment with a TUI frontend
 This file is part of ViewSB
 """
 
+import sys
 import urwid
 import string
+import functools
 import collections
 
 from usb_protocol.types import USBDirection
@@ -14,6 +16,19 @@ from usb_protocol.types import USBDirection
 from ..frontend import ViewSBFrontend
 
 
+# Translation table that maps each printable byte to itself, and every other
+# byte to '.'; used to build the ASCII column of hex views in a single pass.
+_PRINTABLE = frozenset(string.ascii_letters + string.digits + string.punctuation)
+_ASCII_TABLE = bytes(b if chr(b) in _PRINTABLE else ord('.') for b in range(256))
+
+# Interned copies of the palette-attribute names used on the row-render path;
+# interning lets urwid's attribute lookups hash and compare them by identity.
+_ATTR_SUMMARY = sys.intern('summary')
+_ATTR_DATA    = sys.intern('data')
+_ATTR_OKAY    = sys.intern('okay')
+_ATTR_ERROR   = sys.intern('error')
+
+
 class TUIFrontend(ViewSBFrontend):
     """ Text-based packet viewer for ViewSB. """
 
@@ -60,18 +75,33 @@ class TUIFrontend(ViewSBFrontend):
         'icon':    'icon_focus',
     }
 
-    # Initial footer text.
-    DEFAULT_FOOTER_TEXT = [
+    # Initial footer text. This is a static tuple, so every frontend shares
+    # the same markup objects rather than rebuilding them on construction.
+    DEFAULT_FOOTER_TEXT = (
         ('title', "ViewSB USB Analyzer"), "    ",
         ('key', "+"), "=expand ",
         ('key', "-"), "=collapse  ",
         ('key', "a"), "utoscroll ",
         ('key', "c"), "lear ",
         ('key', "q"), "uit ",
-    ]
+    )
+
+    # How often our fallback housekeeping pass runs when no packet data is
+    # arriving, in seconds. Packet handling itself is driven by the IPC file
+    # descriptors, so this just catches anything that slips through.
+    BACKGROUND_REFRESH_INTERVAL = 5.0
+
+    # Maximum number of packets applied to the packet tree per refresh tick;
+    # bounding this keeps keyboard input responsive during packet floods.
+    MAX_PACKETS_PER_TICK = 512
 
-    # How often we poll the backend for new packets, in seconds.
-    BACKGROUND_REFRESH_INTERVAL = 0.25
+    # Maximum number of packets whose rendered decoder rows we keep cached.
+    DECODER_CACHE_SIZE = 256
+
+    # Maximum number of packet-row widgets kept materialized at once; nodes
+    # beyond this are dropped least-recently-rendered first, and rebuilt on
+    # demand if they scroll back into view.
+    WIDGET_CACHE_SIZE = 1024
 
 
     @classmethod
@@ -88,6 +118,48 @@ class TUIFrontend(ViewSBFrontend):
         super().__init__()
         self.ascii_only = ascii_only
 
+        # Select the icon set once, here, rather than querying the encoding
+        # mode for every packet widget we create.
+        use_utf8 = (urwid.get_encoding_mode() == "utf8") and not ascii_only
+        self._icons             = VSBPacketWidget.UTF8_ICONS if use_utf8 else VSBPacketWidget.ASCII_ICONS
+        self._direction_columns = \
+            VSBPacketWidget.UTF8_DIRECTION_COLUMNS if use_utf8 else VSBPacketWidget.ASCII_DIRECTION_COLUMNS
+
+        # Packets received since the last UI refresh; these are applied to the
+        # packet tree in one batch, so each refresh costs a single invalidation.
+        self._pending_packets = []
+
+        # True iff the packet tree has changed since the last re-render; used to
+        # coalesce multiple invalidations into a single _modified() notification,
+        # and to skip redraw work entirely on ticks where nothing changed.
+        self._dirty = False
+        self._invalidate_scheduled = False
+
+        # The packet most recently rendered into the decoder/hex panels; lets us
+        # skip rebuilding them when a keypress didn't actually move focus.
+        self._last_rendered_packet = None
+
+        # LRU of nodes with materialized widgets, so memory use scales with the
+        # visible window rather than the whole capture.
+        self._materialized_nodes = collections.OrderedDict()
+
+        # LRU of rendered decoder rows, keyed by packet identity; revisiting a
+        # packet reuses its rendered rows instead of rebuilding them.
+        self._decoder_cache = collections.OrderedDict()
+
+        # Handle for our outstanding fallback-communications alarm.
+        self._comm_alarm = None
+
+        # Concrete-type dispatch for rendering decoder tables; avoids paying for
+        # ABC isinstance checks on every rendered detail field.
+        self._decoder_dispatch = {
+            dict:  self.add_key_value_table_to_decoder_view,
+            str:   self.add_string_to_decoder_view,
+            bytes: self.add_hexdump_to_decoder_view,
+            list:  self.add_single_column_table_to_decoder_view,
+            tuple: self.add_single_column_table_to_decoder_view,
+        }
+
         # For now: create a really inefficient in-memory packet store,
         # and anchor our tree-view to that.
         self.packet_store = TUIPacketCollection(self)
@@ -96,11 +168,13 @@ class TUIFrontend(ViewSBFrontend):
         # Generate the TreeList that's we'll use the display our packets.
         # This is the main viewport into the USB data.
         self.dynamic_view = urwid.TreeWalker(self.root_node)
-        self.packet_list  = urwid.AttrWrap(PacketListBox(self.dynamic_view, self.packet_focus_changed), 'packets')
+        self.packet_list  = urwid.AttrWrap(PacketListBox(self.dynamic_view, self, self.packet_focus_changed), 'packets')
         self.packet_list.offset_rows = 1
 
-        # Create the "decoded packet view" box.
-        self.decoder_rows = urwid.SimpleListWalker([])
+        # Create the "decoded packet view" box. Its walker holds cheap row
+        # descriptions, and materializes widgets only for the visible window.
+        self.decoder_rows = _DecoderWalker(self)
+        self._new_decoder_rows = []
         decoder_rows_list = urwid.AttrWrap(urwid.ListBox(self.decoder_rows), 'decoder')
 
         # Create the "raw hex data" box.
@@ -118,7 +192,7 @@ class TUIFrontend(ViewSBFrontend):
         # TODO: generate the footer text dynamically?
         self.header  = VSBPacketWidget.get_row_headers(style='head')
         self.columns = urwid.Columns([('weight', 2, self.packet_list), right_panel], dividechars=1)
-        self.footer  = urwid.Text(self.DEFAULT_FOOTER_TEXT)
+        self.footer  = urwid.Text(list(self.DEFAULT_FOOTER_TEXT))
         self.view    = urwid.Frame(
             body=urwid.AttrWrap(self.columns,  'body'),
             header=urwid.AttrWrap(self.header, 'head'),
@@ -126,13 +200,59 @@ class TUIFrontend(ViewSBFrontend):
         )
 
 
+    def _schedule_invalidate(self):
+        """ Requests a re-render of the packet tree; multiple requests per event-loop pass are coalesced. """
+
+        self._dirty = True
+
+        if not self._invalidate_scheduled:
+            self._invalidate_scheduled = True
+            self.loop.set_alarm_in(0, self._flush_invalidate)
+
+
+    def _flush_invalidate(self, *args):
+        """ Issues the single _modified() notification for any pending invalidations. """
+
+        self._invalidate_scheduled = False
+
+        # If nothing actually changed since the last flush, skip the redraw.
+        if not self._dirty:
+            return
+
+        self._dirty = False
+        self.dynamic_view._modified()
+
+
+    def note_widget_materialized(self, node):
+        """ Records that a node has built its row widget; evicts the least-recently-rendered node if we're full. """
+
+        node_id = id(node)
+
+        # Mark the node as most-recently rendered...
+        self._materialized_nodes[node_id] = node
+        self._materialized_nodes.move_to_end(node_id)
+
+        # ... and if we're over our widget budget, drop the least-recently
+        # rendered node's widgets. They'll be rebuilt if it's displayed again.
+        if len(self._materialized_nodes) > self.WIDGET_CACHE_SIZE:
+            _, evicted = self._materialized_nodes.popitem(last=False)
+            evicted.discard_widgets()
+
+
     def packet_focus_changed(self, focused_packet_node, packet):
         """ Callback that's issued when the focused packet changes. """
 
+        # If the focused packet hasn't actually changed, our panels are already
+        # correct; skip the rebuild.
+        if packet is self._last_rendered_packet:
+            return
+
         # Populate our ancillary packet views.
         self.populate_decoder_view(packet)
         self.populate_hex_view(packet)
 
+        self._last_rendered_packet = packet
+
 
     def populate_hex_view(self, packet):
         """ Populate the bottom-right panel with a hex dump of the given packet. """
@@ -141,82 +261,114 @@ class TUIFrontend(ViewSBFrontend):
         hex_row_width    = 8
         hex_column_ratio = 1
 
-        # Start off with an empty hex view.
-        self.hex_data_rows.clear()
-
         if packet is None or packet.get_raw_data is None:
+            self.hex_data_rows[:] = []
             return
 
         data = packet.get_raw_data()
 
+        if not data:
+            self.hex_data_rows[:] = []
+            return
+
+        # Convert the whole payload to hex in a single pass; we'll slice out the
+        # relevant pieces per-row below, rather than formatting per-byte.
+        hex_str = data.hex()
+
+        hex_lines   = []
+        ascii_lines = []
+
         # Iterate over our data, capturing it into row-length chunks.
         for i in range(0, len(data), hex_row_width):
-            hex_bytes   = []
-            ascii_bytes = []
 
             # Extract the data chunk we're looking for.
             chunk = data[i:i + hex_row_width]
 
-            # Iterate over each byte in the given chunk.
-            for byte in chunk:
-
-                # Add the hex byte to our byte view...
-                hex_bytes.append('{:02x}'.format(byte))
-
-                # ... and add our ASCII summary.
-                char = chr(byte)
-                if char in string.ascii_letters + string.digits + string.punctuation:
-                    ascii_bytes.append(char)
-                else:
-                    ascii_bytes.append('.')
+            # Split this row's slice of the hex string into space-separated byte pairs.
+            row_hex   = hex_str[2 * i:2 * (i + hex_row_width)]
+            hex_bytes = ' '.join(row_hex[j:j + 2] for j in range(0, len(row_hex), 2))
 
             # Pad out the last row, for alignment.
             if len(chunk) < hex_row_width:
-                for _ in range(0, hex_row_width - len(chunk)):
-                    hex_bytes.append('  ')
+                hex_bytes += '   ' * (hex_row_width - len(chunk))
 
 
-            # Generate summaries in hex and ascii...
-            hex_summary   = urwid.Text(' '.join(hex_bytes), align='right')
-            ascii_summary = urwid.Text(''.join(ascii_bytes), align='left')
+            # Collect each row in hex and ascii; the ASCII summary is built
+            # with a single C-level translate rather than a per-byte loop.
+            hex_lines.append(hex_bytes)
+            ascii_lines.append(chunk.translate(_ASCII_TABLE).decode('ascii'))
 
+        # Render the whole dump as two multi-line text widgets, rather than a
+        # pair of widgets per row; this keeps widget count (and layout passes)
+        # constant regardless of packet length.
+        row = urwid.Columns([
+            ('weight', hex_column_ratio, urwid.Text('\n'.join(hex_lines), align='right')),
+            ('weight', 1, urwid.Text('\n'.join(ascii_lines), align='left')),
+        ], dividechars=1)
 
-            # ... and add them to our view.
-            row = urwid.Columns([
-                ('weight', hex_column_ratio, hex_summary),
-                ('weight', 1, ascii_summary),
-            ], dividechars=1)
-            self.hex_data_rows.append(row)
+        # Replace the view contents with a single slice-assignment, so the
+        # list walker issues just one modification notification.
+        self.hex_data_rows[:] = [row]
 
 
 
     def populate_decoder_view(self, packet):
         """ Populate the top-right panel with the decoded version of a given packet. """
 
-        # Start off with an empty decoder view.
-        self.decoder_rows.clear()
-
         if packet is None:
+            self.decoder_rows.set_rows([])
             return
 
+        # If we've rendered this packet recently, reuse its rendered rows;
+        # otherwise, build (and cache) a fresh rendering.
+        key  = id(packet)
+        rows = self._decoder_cache.get(key)
+
+        if rows is None:
+            rows = self._build_decoder_rows(packet)
+            self._decoder_cache[key] = rows
+
+            # If the cache has outgrown its bound, evict the oldest rendering.
+            if len(self._decoder_cache) > self.DECODER_CACHE_SIZE:
+                self._decoder_cache.popitem(last=False)
+        else:
+            self._decoder_cache.move_to_end(key)
+
+        # Install the new contents in one shot.
+        self.decoder_rows.set_rows(rows)
+
+
+    def _build_decoder_rows(self, packet):
+        """ Builds the decoder-view row descriptions for a given packet, returning them as a list.
+
+        Rows are cheap description tuples; the decoder walker turns them into
+        widgets on demand, so only the visible window is ever materialized.
+        """
+
+        # Build the new view contents locally; we'll install them in a single
+        # assignment so the list walker sees only one modification.
+        self._new_decoder_rows = []
+
         fields = packet.get_detail_fields()
 
         if not fields:
-            return
+            return self._new_decoder_rows
 
         # Render each table in the detail fields.
         for table_name, contents in fields:
 
             # Render the table name, and its contents.
-            self.decoder_rows.append(urwid.Text(('header', table_name)))
+            self._new_decoder_rows.append(('header', table_name))
 
-            if isinstance(contents, collections.Mapping):
+            # Dispatch on the concrete type, falling back to the (slower) ABC
+            # checks only for types we haven't seen before.
+            handler = self._decoder_dispatch.get(type(contents))
+
+            if handler is not None:
+                handler(contents)
+            elif isinstance(contents, collections.abc.Mapping):
                 self.add_key_value_table_to_decoder_view(contents)
-            elif isinstance(contents, str):
-                self.add_string_to_decoder_view(contents)
-            elif isinstance(contents, bytes):
-                self.add_hexdump_to_decoder_view(contents)
-            elif isinstance(contents, collections.Sequence):
+            elif isinstance(contents, collections.abc.Sequence):
                 self.add_single_column_table_to_decoder_view(contents)
             else:
                 self.add_string_to_decoder_view(
@@ -224,7 +376,9 @@ class TUIFrontend(ViewSBFrontend):
                     style='error')
 
             # Render a spacer after each table.
-            self.decoder_rows.append(urwid.Text(('spacer', '')))
+            self._new_decoder_rows.append(('spacer',))
+
+        return self._new_decoder_rows
 
 
     def add_hexdump_to_decoder_view(self, contents):
@@ -241,23 +395,22 @@ class TUIFrontend(ViewSBFrontend):
 
 
     def add_string_to_decoder_view(self, string, style=''):
-        """ Adds a string to the sequence of decoder view widgets. """
+        """ Adds a string to the sequence of decoder view rows. """
 
-        # Create a string that's padded from the edges, and wrapped in a style.
-        self.decoder_rows.append(self.format_string_for_view(string, style))
+        # Record the string and style; the walker will pad and style it if and
+        # when the row is actually displayed.
+        self._new_decoder_rows.append(('string', string, style))
 
 
-    def format_string_for_view(self, string, style='', padding=1):
+    def format_string_for_view(self, string, style=''):
         """
-        Wraps a given string in a stack of UI elements; preparing it to be added to
+        Wraps a given string in a styled text widget; preparing it to be added to
         a display table.
         """
 
-        string = urwid.Text(('value_name', string))
-        string = urwid.Padding(string, left=padding, right=padding)
-        string = urwid.AttrWrap(string, style)
-
-        return string
+        # Pad the string with spaces rather than wrapping it in a Padding widget;
+        # this keeps us to a single widget allocation per cell.
+        return urwid.AttrMap(urwid.Text((style or 'value_name', ' ' + string + ' ')), style)
 
 
     def add_key_value_table_to_decoder_view(self, table):
@@ -265,11 +418,7 @@ class TUIFrontend(ViewSBFrontend):
 
         # Add each key/value pair to our table.
         for key, value in table.items():
-            columns = urwid.Columns([
-                self.format_string_for_view(str(key), style='key_column'),
-                self.format_string_for_view(str(value))
-            ])
-            self.decoder_rows.append(columns)
+            self._new_decoder_rows.append(('key_value', str(key), str(value)))
 
 
     def handle_communications(self):
@@ -282,21 +431,29 @@ class TUIFrontend(ViewSBFrontend):
         # Hook the analyzer to automatically schedule a subsequent communication each time
         # we check for packets.
         super().handle_communications()
-        self.schedule_next_communication()
+        self.flush_pending_packets()
 
+        # If this tick changed the packet tree, issue the (single) re-render
+        # now, rather than waiting on the scheduled flush.
+        if self._dirty:
+            self._flush_invalidate()
 
-    def schedule_next_communication(self):
-        """ Schedules the next comms check; which handles periodic loading of received packets into the UI. """
+        self.schedule_next_communication()
 
-        # Ask the main loop to call our comms handler after a REFRESH_INTERVAL delay.
-        self.loop.set_alarm_in(self.BACKGROUND_REFRESH_INTERVAL, lambda _, __ : self.handle_communications())
 
+    def flush_pending_packets(self):
+        """ Applies any packets received since the last refresh to the UI in a single batch. """
 
-    def handle_incoming_packet(self, packet):
-        """ Pass any incoming packets to our packet collection. """
+        if not self._pending_packets:
+            return
+
+        # Take a bounded batch of pending packets, so a packet flood can't
+        # starve keyboard handling; any leftovers wait for the next tick.
+        batch = self._pending_packets[:self.MAX_PACKETS_PER_TICK]
+        del self._pending_packets[:self.MAX_PACKETS_PER_TICK]
 
-        # Add the packet to our packet collection...
-        self.root_node.add_packet(packet)
+        # Add the whole batch to our packet collection, issuing a single invalidation.
+        self.root_node.add_packets(batch)
 
         # If we're in autoscroll mode, handle autoscrolling.
         if self.packet_list.autoscroll:
@@ -306,6 +463,35 @@ class TUIFrontend(ViewSBFrontend):
             self.loop.process_input(['end', 'a'])
 
 
+    def schedule_next_communication(self):
+        """ (Re)schedules the fallback comms check; packet handling itself is driven by the IPC file descriptors. """
+
+        # Replace any outstanding fallback alarm, so exactly one is pending.
+        if self._comm_alarm is not None:
+            self.loop.remove_alarm(self._comm_alarm)
+
+        # If packets are still waiting -- either in our pending batch or already
+        # pulled across the IPC boundary -- come back as soon as the event loop
+        # has had a chance to handle input, so a backlog drains at full speed
+        # rather than one MAX_PACKETS_PER_TICK batch per fallback interval.
+        if self._pending_packets or self._incoming_packets:
+            delay = 0
+        else:
+            delay = self.BACKGROUND_REFRESH_INTERVAL
+
+        # Ask the main loop to call our comms handler after the computed delay.
+        self._comm_alarm = \
+            self.loop.set_alarm_in(delay, lambda _, __ : self.handle_communications())
+
+
+    def handle_incoming_packet(self, packet):
+        """ Pass any incoming packets to our pending-packet batch. """
+
+        # Collect the packet; it'll be applied to the packet collection -- along with
+        # any others received this tick -- in flush_pending_packets().
+        self._pending_packets.append(packet)
+
+
     def unhandled_input(self, key):
         """ Handle any input that's not handled by e.g. the focused widget. """
 
@@ -347,6 +533,11 @@ class TUIFrontend(ViewSBFrontend):
         # so we can feel free to just take it back, here.
         self.loop.screen._term_input_file = self.stdin
 
+        # Wake on actual packet data (or a forwarded exception), rather than
+        # polling on a short timer; the TUI then costs no CPU while idle.
+        self.loop.watch_file(self.data_queue._reader.fileno(), self.handle_communications)
+        self.loop.watch_file(self._exception_conn.fileno(), self.handle_communications)
+
         # Run the main TUI.
         self.schedule_next_communication()
         try:
@@ -378,9 +569,97 @@ class ExceptionDialog(urwid.WidgetWrap):
         self.__super.__init__(urwid.AttrWrap(fill, 'popup'))
 
 
+class _DecoderWalker(urwid.ListWalker):
+    """
+    List walker for the decoder panel that stores rows as cheap description
+    tuples, and only materializes urwid widgets for positions actually rendered.
+    """
+
+    def __init__(self, frontend):
+        self.frontend = frontend
+
+        # The current row descriptions, and the widgets we've materialized so far.
+        self.rows     = []
+        self._widgets = {}
+
+        self._focus = 0
+
+
+    def set_rows(self, rows):
+        """ Replaces the walker's contents with a new list of row descriptions. """
+
+        self.rows = rows
+        self._widgets.clear()
+        self._focus = 0
+        self._modified()
+
+
+    def _materialize(self, position):
+        """ Returns the widget for a given row, building it on first use. """
+
+        widget = self._widgets.get(position)
+
+        if widget is None:
+            row  = self.rows[position]
+            kind = row[0]
+
+            if kind == 'header':
+                widget = urwid.Text(('header', row[1]))
+            elif kind == 'key_value':
+                widget = urwid.Columns([
+                    self.frontend.format_string_for_view(row[1], style='key_column'),
+                    self.frontend.format_string_for_view(row[2])
+                ])
+            elif kind == 'string':
+                widget = self.frontend.format_string_for_view(row[1], row[2])
+            else:
+                widget = urwid.Text(('spacer', ''))
+
+            self._widgets[position] = widget
+
+        return widget
+
+
+    def get_focus(self):
+        if not self.rows:
+            return None, None
+
+        return self._materialize(self._focus), self._focus
+
+
+    def set_focus(self, position):
+        self._focus = position
+        self._modified()
+
+
+    def get_next(self, position):
+        position += 1
+
+        if position >= len(self.rows):
+            return None, None
+
+        return self._materialize(position), position
+
+
+    def get_prev(self, position):
+        position -= 1
+
+        if position < 0:
+            return None, None
+
+        return self._materialize(position), position
+
+
 class PacketListBox(urwid.TreeListBox):
 
-    def __init__(self, walker, focus_changed_callback=None):
+    # How long to wait after a focus change before rebuilding the (relatively
+    # expensive) decoder and hex panels; coalesces key-repeat scrolling.
+    FOCUS_CALLBACK_DELAY = 0.05
+
+    def __init__(self, walker, frontend=None, focus_changed_callback=None):
+
+        # Store the frontend whose views we feed; used to schedule callbacks.
+        self.frontend = frontend
 
         # Start off with no previously-focused element.
         self.last_focus = False
@@ -388,6 +667,11 @@ class PacketListBox(urwid.TreeListBox):
         # Register our focus-changed callback.
         self.focus_changed_callback = focus_changed_callback
 
+        # Focus-change delivery state; we deliver only the most recent focus
+        # target once the debounce delay elapses.
+        self._pending_focus_node  = None
+        self._focus_alarm_pending = False
+
         # Autoscroll by default.
         self.autoscroll = True
 
@@ -397,13 +681,24 @@ class PacketListBox(urwid.TreeListBox):
     def focus_changed(self):
         """ Called when the focus may have changed; handles focus-change event generation. """
 
-        # Get the currently focused node, and re-render it with focus.
+        # Get the currently focused node; if focus hasn't actually moved, there's
+        # nothing to re-render and no callback to deliver.
         focused_node = self.focus.get_node()
+        if focused_node is self.last_focus:
+            return
+
+        # Re-render the newly-focused node with focus.
         focused_node.rerender_with_focus(True)
 
-        # If we have a "focus changed" callback, call it.
+        # If we have a "focus changed" callback, schedule its delivery. Rather
+        # than rebuilding the side panels per keypress, we deliver only the most
+        # recent focus target once the debounce delay elapses.
         if callable(self.focus_changed_callback):
-            self.focus_changed_callback(focused_node, focused_node.get_value())
+            self._pending_focus_node = focused_node
+
+            if not self._focus_alarm_pending:
+                self._focus_alarm_pending = True
+                self.frontend.loop.set_alarm_in(self.FOCUS_CALLBACK_DELAY, self._deliver_focus_change)
 
         # If we had a previously focused node, let it know it's no longer focused.
         if self.last_focus and self.last_focus != focused_node:
@@ -413,6 +708,15 @@ class PacketListBox(urwid.TreeListBox):
         self.last_focus = focused_node
 
 
+    def _deliver_focus_change(self, *args):
+        """ Delivers the most recent focus change to our focus-changed callback. """
+
+        self._focus_alarm_pending = False
+
+        node = self._pending_focus_node
+        self.focus_changed_callback(node, node.get_value())
+
+
     def keypress(self, size, key):
         """ Keypress interposer that issues the "focus change detect" code after a keypress. """
 
@@ -469,24 +773,93 @@ class PacketListBox(urwid.TreeListBox):
 
 
 
+class _RangeKeys(collections.abc.Sequence):
+    """
+    Sequence that stands in for the child-key list [0, 1, ..., n-1] while
+    storing only its length; packet nodes key their children by index, so
+    materializing the full list per node is pure waste.
+    """
+
+    __slots__ = ('n',)
+
+    def __init__(self, n=0):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return range(self.n)[index]
+        if index < 0:
+            index += self.n
+        if not 0 <= index < self.n:
+            raise IndexError(index)
+        return index
+
+    def index(self, value):
+        if 0 <= value < self.n:
+            return value
+        raise ValueError("{} is not in range".format(value))
+
+    def append(self, key):
+        self.n += 1
+
+    def extend(self, keys):
+        self.n += len(keys)
+
+
 class VSBPacketNode(urwid.ParentNode):
     """ Data storage object for interior/parent nodes. """
 
+    # One node exists per displayed packet, so keep our own attributes in
+    # slots. (The urwid base classes still carry a __dict__, but our hot
+    # attributes get the faster slot access.)
+    __slots__ = ('frontend', '_cached_child_keys', '_cached_child_count',
+        '_unhighlighted_widget', '_highlighted_widget')
+
+    # Shared attribute map applied to focused rows; the None entry restyles any
+    # unstyled text, and the named entries restyle our normal palette entries.
+    _FOCUS_ATTR_MAP = {None: 'focus', **TUIFrontend.FOCUSED_COLOR_MAPPINGS}
+
 
     def __init__(self, packet_store, frontend, *args, **kwargs):
         self.frontend = frontend
+
+        # Cached child-key list; urwid queries child keys constantly during
+        # rendering, so we avoid rebuilding this list on every lookup.
+        self._cached_child_keys  = None
+        self._cached_child_count = None
+
+        # Our materialized widgets; both are built lazily, and the highlighted
+        # variant only ever exists for nodes that have received focus.
+        self._unhighlighted_widget = None
+        self._highlighted_widget   = None
+
         super().__init__(packet_store, *args, **kwargs)
 
 
     def _invalidate(self):
         """ Mark the current node as requiring a re-render. """
-        self.frontend.dynamic_view._modified()
+        self.frontend._schedule_invalidate()
 
 
     def rerender_with_focus(self, focus):
         """ Re-render the given node with or without focus."""
 
+        # Ensure our base widget exists; it may have been discarded or not yet built.
+        if self._unhighlighted_widget is None:
+            self.get_widget()
+
         if focus:
+
+            # Build the focused variant lazily; most nodes are never focused.
+            # This must be an AttrWrap rather than an AttrMap: the tree walker
+            # calls prev_inorder()/next_inorder() on the focused widget, and
+            # only AttrWrap delegates those to the wrapped TreeWidget.
+            if self._highlighted_widget is None:
+                self._highlighted_widget = urwid.AttrWrap(self._unhighlighted_widget, self._FOCUS_ATTR_MAP)
+
             self._widget = self._highlighted_widget
         else:
             self._widget = self._unhighlighted_widget
@@ -500,18 +873,51 @@ class VSBPacketNode(urwid.ParentNode):
 
 
     def add_packet(self, packet):
-        if self._child_keys:
-            self._child_keys.append(self.next_key())
-        else:
-            self._child_keys = [self.next_key()]
-
         self.get_value().accept_packet(packet)
+        self._sync_child_keys()
         self._invalidate()
 
 
+    def add_packets(self, packets):
+        """ Adds a batch of packets to the node, issuing only a single invalidation. """
+
+        # Accept each of the new packets...
+        collection = self.get_value()
+        for packet in packets:
+            collection.accept_packet(packet)
+
+        # ... re-sync our keys to the collection in one shot, and issue a
+        # single re-render for the whole batch.
+        self._sync_child_keys()
+        self._invalidate()
+
+
+    def _sync_child_keys(self):
+        """ Matches our child keys to the collection's (possibly history-bounded) packet list. """
+
+        count = len(self.get_value().subordinate_packets)
+
+        # If the collection dropped old history to stay within its bound, our
+        # positional keys now refer to different packets; drop the stale child
+        # nodes so they're rebuilt against the right packets.
+        if self._child_keys is not None and count <= len(self._child_keys):
+            self._children.clear()
+
+        self._child_keys = _RangeKeys(count)
+
+
     def remove_all_packets(self):
         self.get_value().clear_packets()
-        self._child_keys = []
+        self._child_keys = _RangeKeys()
+
+        # The old packet nodes are gone; drop our references to their widgets
+        # and renderings, as their identities may be reused by future packets.
+        # Our own child-node cache has to go too, or a refilled key 0 would
+        # hand back the node for the old packet 0.
+        self._children.clear()
+        self.frontend._materialized_nodes.clear()
+        self.frontend._decoder_cache.clear()
+
         self._invalidate()
 
 
@@ -519,20 +925,35 @@ class VSBPacketNode(urwid.ParentNode):
         """ Returns the widget used to render the current icon. """
 
         self._unhighlighted_widget = VSBPacketWidget(self, self.get_value(), self.frontend)
-        self._highlighted_widget   = urwid.AttrWrap(
-                urwid.AttrWrap(self._unhighlighted_widget, 'focus'),
-                TUIFrontend.FOCUSED_COLOR_MAPPINGS
-            )
+
+        # Let the frontend know we've materialized a widget, so it can bound
+        # the total number of live row widgets.
+        self.frontend.note_widget_materialized(self)
+
         return self._unhighlighted_widget
 
 
+    def discard_widgets(self):
+        """ Drops our materialized widgets; they'll be lazily rebuilt if we're rendered again. """
+
+        self._widget               = None
+        self._unhighlighted_widget = None
+        self._highlighted_widget   = None
+
+
     def load_child_keys(self):
         """ Return all of the child packet indices for the given node. """
 
-        # Our child packets are just organized into a list,
-        # so we can just return a range of the same length as our list.
-        packet = self.get_value()
-        return list(range(len(packet.subordinate_packets)))
+        # Our child packets are just organized into a list, so our keys are just
+        # a range of the same length as our list. Rebuild the cached key
+        # sequence only when the subordinate-packet count has actually changed.
+        count = len(self.get_value().subordinate_packets)
+
+        if self._cached_child_count != count:
+            self._cached_child_keys  = _RangeKeys(count)
+            self._cached_child_count = count
+
+        return self._cached_child_keys
 
 
     def get_child_keys(self):
@@ -556,6 +977,13 @@ class VSBPacketNode(urwid.ParentNode):
 class VSBPacketWidget(urwid.TreeWidget):
     """ Widget that renders tree elements as text. """
 
+    # Slot the attributes we touch on every redraw; attributes managed by the
+    # urwid base classes continue to live in the instance __dict__.
+    __slots__ = ('packet', 'frontend', 'is_root', 'focused',
+        '_cached_row_widget', '_cached_row_count', '_row_values',
+        '_cached_display_text', '_cached_text_children',
+        'ICONS', 'DIRECTION_COLUMNS')
+
     # If we're in utf8 mode, use fancier widgets than we would in ASCII mode.
     UTF8_ICONS = {
         'unexpanded': urwid.SelectableIcon('⊞', 0),
@@ -573,6 +1001,20 @@ class VSBPacketWidget(urwid.TreeWidget):
         'out':        urwid.Text('O>')
     }
 
+    # Pre-built (width, widget) column entries for the direction field; these
+    # are immutable, so one copy can be shared between all packet rows.
+    UTF8_DIRECTION_COLUMNS = {
+        USBDirection.IN:  (6, UTF8_ICONS['in']),
+        USBDirection.OUT: (6, UTF8_ICONS['out']),
+        None:             (6, urwid.Text("")),
+    }
+
+    ASCII_DIRECTION_COLUMNS = {
+        USBDirection.IN:  (6, ASCII_ICONS['in']),
+        USBDirection.OUT: (6, ASCII_ICONS['out']),
+        None:             (6, urwid.Text("")),
+    }
+
 
     def __init__(self, parent, packet, frontend, focused=False):
 
@@ -581,10 +1023,22 @@ class VSBPacketWidget(urwid.TreeWidget):
         self.is_root = False
         self.focused = focused
 
-        if urwid.get_encoding_mode() == "utf8" and not frontend.ascii_only:
-            self.ICONS = self.UTF8_ICONS
-        else:
-            self.ICONS = self.ASCII_ICONS
+        # Cached row rendering; rebuilt only when the packet grows new subordinates.
+        self._cached_row_widget = None
+        self._cached_row_count  = None
+
+        # Flat tuple of the summary values our row displays; captured when the
+        # row is (re)built, so redraws never touch the summary dictionary.
+        self._row_values = None
+
+        # Cached display markup; packets don't change after capture, so this
+        # only needs rebuilding if the packet gains subordinates.
+        self._cached_display_text  = None
+        self._cached_text_children = None
+
+        # Adopt the icon set the frontend selected at startup.
+        self.ICONS             = frontend._icons
+        self.DIRECTION_COLUMNS = frontend._direction_columns
 
         super().__init__(parent)
 
@@ -633,17 +1087,17 @@ class VSBPacketWidget(urwid.TreeWidget):
         return widget
 
 
-    def _get_direction_icon(self, direction, width=6):
+    def _get_direction_icon(self, direction):
 
-        if direction == USBDirection.IN:
-            return (width, self.ICONS['in'])
-        elif direction == USBDirection.OUT:
-            return (width, self.ICONS['out'])
-        else:
-            return (width, urwid.Text(""))
+        # Look up the pre-built column entry for the given direction.
+        try:
+            return self.DIRECTION_COLUMNS[direction]
+        except KeyError:
+            return self.DIRECTION_COLUMNS[None]
 
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_row_headers(cls, style=''):
         """ Returns a columns object suitable for column headers."""
 
@@ -658,6 +1112,22 @@ class VSBPacketWidget(urwid.TreeWidget):
 
 
 
+    def _capture_row_values(self):
+        """ Captures the summary values our row displays as a flat tuple of primitives. """
+
+        summary = self.packet.get_summary_fields()
+
+        self._row_values = (
+            summary['device_address'],
+            summary['endpoint'],
+            summary['is_in'],
+            summary['length'],
+            summary['status'],
+            summary['data_summary'],
+            summary['style'],
+        )
+
+
     def get_row_widget(self):
         """ Returns the widget that represents the given packet. """
 
@@ -667,24 +1137,35 @@ class VSBPacketWidget(urwid.TreeWidget):
         if packet.get_summary_fields is None:
             return urwid.Text("")
 
-        summary = packet.get_summary_fields()
+        # If we've already rendered this packet, and it hasn't since gained any
+        # subordinate packets, reuse our cached rendering.
+        subordinate_count = len(packet.subordinate_packets) if packet.subordinate_packets else 0
+        if (self._cached_row_widget is not None) and (self._cached_row_count == subordinate_count):
+            return self._cached_row_widget
+
+        # (Re-)capture the summary values we display.
+        self._capture_row_values()
+        device_address, endpoint, direction, length, status, data_summary, style = self._row_values
 
         # Generate the style for our packet's style.
-        status_style = 'okay'
-        if summary['style'] and ('exceptional' in summary['style']):
-            status_style = 'error'
+        status_style = _ATTR_OKAY
+        if style and ('exceptional' in style):
+            status_style = _ATTR_ERROR
 
         # Get the fields of our packet entry.
-        return urwid.Columns([
-            #self._get_text_column(summary['bus_number'],      width=3),
-            self._get_text_column(summary['device_address'],  width=3),
-            self._get_text_column(summary['endpoint'],        width=3),
-            self._get_direction_icon(summary['is_in']),
-            self._get_text_column(summary['length'], autohex=False, width=5, empty=''),
+        self._cached_row_widget = urwid.Columns([
+            #self._get_text_column(bus_number,    width=3),
+            self._get_text_column(device_address, width=3),
+            self._get_text_column(endpoint,       width=3),
+            self._get_direction_icon(direction),
+            self._get_text_column(length, autohex=False, width=5, empty=''),
             self.get_indented_core(),
-            self._get_text_column(summary['status'], style=status_style, width=6, align='center'),
-            self._get_text_column(summary['data_summary'], style='data')
+            self._get_text_column(status, style=status_style, width=6, align='center'),
+            self._get_text_column(data_summary, style=_ATTR_DATA)
         ], dividechars=1)
+        self._cached_row_count = subordinate_count
+
+        return self._cached_row_widget
 
 
     def get_indented_core(self):
@@ -711,7 +1192,22 @@ class VSBPacketWidget(urwid.TreeWidget):
 
 
     def get_display_text(self):
-        return [('summary', self.packet.summarize())]
+
+        # Prefer the markup pre-rendered when the packet was ingested.
+        text = getattr(self.packet, '_display_text', None)
+        if text is not None:
+            return text
+
+        # Otherwise -- e.g. for subordinate packets, which don't pass through
+        # ingest -- rebuild our markup only if we've never built it, or if the
+        # packet has since gained subordinate packets (which can change its summary).
+        child_count = len(self.packet.subordinate_packets) if self.packet.subordinate_packets else 0
+
+        if (self._cached_display_text is None) or (self._cached_text_children != child_count):
+            self._cached_display_text  = [(_ATTR_SUMMARY, self.packet.summarize())]
+            self._cached_text_children = child_count
+
+        return self._cached_display_text
 
     def selectable(self):
         # Always allow our packets to be selectable, so the user can
@@ -774,6 +1270,15 @@ class VSBRootNode(VSBPacketNode):
 class TUIPacketCollection:
     """ Simple collection of displayed packets for ourTUI. """
 
+    # Unlike the widget classes, we have no dict-bearing base here, so slots
+    # buy us both the smaller instances and the faster attribute access.
+    __slots__ = ('data', 'frontend', 'subordinate_packets',
+        'get_raw_data', 'get_summary_fields')
+
+    # Bound on our in-memory packet history; once we're past this many packets,
+    # the oldest packets are dropped as new ones arrive.
+    MAX_PACKETS = 100000
+
     def __init__(self, frontend):
 
         self.data = None
@@ -784,13 +1289,28 @@ class TUIPacketCollection:
         # Start off with an empty list of subordinate packets.
         self.subordinate_packets = []
 
+        # Explicit stand-ins for the pieces of the ViewSBPacket interface we
+        # don't provide; the rendering code checks these against None before
+        # use, and explicit attributes keep lookups off the __getattr__ path.
+        self.get_raw_data       = None
+        self.get_summary_fields = None
+
     def clear_packets(self):
         self.subordinate_packets = []
 
     def accept_packet(self, packet):
         """ Accepts a new subordinate packet into the collection. """
+
+        # Pre-render the packet's display markup once, at ingest; rendering the
+        # packet row then never needs to re-summarize the packet.
+        packet._display_text = [(_ATTR_SUMMARY, packet.summarize())]
+
         self.subordinate_packets.append(packet)
 
+        # If we've outgrown our history bound, discard the oldest packet.
+        if len(self.subordinate_packets) > self.MAX_PACKETS:
+            del self.subordinate_packets[0]
+
     def summarize(self):
         return "New Capture ({}):".format(len(self.subordinate_packets))
 
@@ -802,7 +1322,3 @@ class TUIPacketCollection:
 
     def get_detail_fields(self):
         return []
-
-
-    def __getattr__(self, attr):
-        return None
@@ -6,6 +6,7 @@ Used for comms between the frontend, backend, and analyzer threads.
 This file is part of ViewSB
 """
 
+import collections
 import multiprocessing
 import traceback
 
@@ -21,15 +22,25 @@ class Process(multiprocessing.Process):
         try:
             multiprocessing.Process.run(self)
         except Exception as e:
-            self._exception_conn.send((e, traceback.format_exc()))
+            # Send the exception's name rather than the exception itself; arbitrary
+            # exception objects aren't always picklable, and our handlers only ever
+            # display the formatted traceback anyway.
+            self._exception_conn.send((type(e).__qualname__, traceback.format_exc()))
 
 
 class ProcessManager:
     """
     Base class for objects used to spawn and control remote processes.
     Subclasses are used by the analyzer thread to spawn Frontend and Backend processes.
+
+    Packets are shuttled across the process boundary in batches (lists), so the
+    per-item pickling and locking overhead is amortized over many packets.
     """
 
+    # The maximum number of packets allowed to accumulate before a batch is
+    # forced across the process boundary.
+    PACKET_BATCH_SIZE = 256
+
     def __init__(
         self,
         remote_class,
@@ -42,6 +53,10 @@ class ProcessManager:
 
         # Create our output queue and our termination-signaling event.
         self.data_queue          = multiprocessing.Queue()
+
+        # Batching state for each direction of packet travel.
+        self._outgoing_packets = []
+        self._incoming_packets = collections.deque()
         self.backend_setup_queue = backend_setup_queue
         self.backend_ready       = backend_ready
         self.termination_event   = multiprocessing.Event()
@@ -89,8 +104,24 @@ class ProcessManager:
 
 
     def issue_packet(self, packet):
-        """ Consumes packets from the analyzer, and sends them over to the remote process. """
-        self.data_queue.put(packet)
+        """ Consumes packets from the analyzer, and sends them over to the remote process.
+
+        Packets are accumulated locally and sent in batches; callers should invoke
+        flush_packets() once per processing pass to bound delivery latency.
+        """
+
+        self._outgoing_packets.append(packet)
+
+        if len(self._outgoing_packets) >= self.PACKET_BATCH_SIZE:
+            self.flush_packets()
+
+
+    def flush_packets(self):
+        """ Sends any accumulated outgoing packets to the remote process as a single batch. """
+
+        if self._outgoing_packets:
+            self.data_queue.put(self._outgoing_packets)
+            self._outgoing_packets = []
 
 
     def read_packet(self, blocking=True, timeout=None):
@@ -100,7 +131,21 @@ class ProcessManager:
             blocking -- If set, the read will block until a packet is available.
             timeout -- The longest time to wait on a blocking read, in floating-point seconds.
         """
-        return self.data_queue.get(blocking, timeout=timeout)
+
+        # If we have packets left over from a previously-received batch, hand
+        # one of those out before touching the queue.
+        if self._incoming_packets:
+            return self._incoming_packets.popleft()
+
+        # For non-blocking reads, use the get_nowait fast path, which skips the
+        # timeout machinery entirely.
+        if not blocking:
+            batch = self.data_queue.get_nowait()
+        else:
+            batch = self.data_queue.get(True, timeout=timeout)
+
+        self._incoming_packets.extend(batch)
+        return self._incoming_packets.popleft()
 
 
     def stop(self):
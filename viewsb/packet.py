@@ -8,17 +8,29 @@ This file is part of ViewSB
 # pylint: disable=maybe-no-member,access-member-before-definition
 
 import struct
-import binascii
-from enum import Flag, auto
+import operator
+from enum import IntFlag, auto
 from construct import BitStruct, BitsInteger, BitsSwapped, Bytewise, Byte, Int16ul
 
 from usb_protocol.types import USBDirection, USBRequestType, USBRequestRecipient, USBPacketID
 
 
-# XXX Temporary hack for __repr__.
-print_depth = 0
+# Pre-compiled struct for the eight-byte setup packet payload; compiling once
+# avoids re-parsing the format string for every setup transaction.
+_SETUP_DATA_STRUCT = struct.Struct("<BBHHH")
 
-class ViewSBStatus(Flag):
+# Packs a PID (or any other single byte) into a byte string, without building
+# an intermediate list the way bytes([pid]) would.
+_pack_byte = struct.Struct("B").pack
+
+# Shared summaries for token packets, keyed by PID. The string is identical for
+# every packet carrying the same token, so build each of them exactly once.
+_TOKEN_SUMMARIES = {
+    pid: f"{pid.summarize()} token"
+    for pid in (USBPacketID.OUT, USBPacketID.IN, USBPacketID.SOF, USBPacketID.SETUP)
+}
+
+class ViewSBStatus(IntFlag):
     """ Enumeration representing USB packet statuses. """
 
     # Flags that can be provided for each flag.
@@ -51,21 +63,34 @@ class ViewSBPacket:
     # can call `parse_data` to automatically parse its data payload.
     DATA_FORMAT = None
 
+    # True only on data-carrying transaction classes; reading this class attribute
+    # is cheaper than an isinstance() check in loops over thousands of subordinates.
+    IS_DATA_TRANSACTION = False
+
 
     @classmethod
     def get_fields(cls):
         """ Defines the fields that make up this packet. """
 
+        # A class's full field set never changes once it's defined, so walk the
+        # MRO only the first time each class asks. We look in the class's own
+        # __dict__ here, so a subclass never inherits its parent's cached set.
+        fields = cls.__dict__.get('_all_fields')
+        if fields is not None:
+            return fields
+
         fields = set()
 
         # Build a list of all fields in the given class and all parent classes.
-        # The simplest way to do this is just to grab all of the FIELDS properties in the method resolution order.
-        for relevant_class in cls.mro():
+        # The simplest way to do this is just to grab all of the FIELDS properties in the method resolution
+        # order; __mro__ is the precomputed tuple, so reading it doesn't build a fresh list the way mro() does.
+        for relevant_class in cls.__mro__:
             if hasattr(relevant_class, 'FIELDS'):
                 fields |= relevant_class.FIELDS
 
-        # Otherwise, extend the class with our local fields.
-        return fields
+        # Cache the result on the class for every future construction.
+        cls._all_fields = frozenset(fields)
+        return cls._all_fields
 
 
     def __init__(self, **kwargs):
@@ -150,6 +175,10 @@ class ViewSBPacket:
             else:
                 return
 
+        # If the field already carries the target type, there's nothing to convert.
+        if isinstance(getattr(self, field_name), as_type):
+            return
+
         # If the type has a parse method; use it.
         # Otherwise, call the type's constructor with the relevant value.
         if hasattr(as_type, 'parse'):
@@ -190,9 +219,16 @@ class ViewSBPacket:
 
             summary -- A short string description of the relevant packet, such as "IN transaction" or "set address request".
             data_summary - A short string description of any data included, such as "address=3" or "AA BB CC DD EE ..."
+
+        The result is computed once and cached on the packet; by the time a frontend asks for
+        summary fields, analysis has completed and the packet no longer changes.
         """
 
-        return {
+        fields = getattr(self, '_summary_fields', None)
+        if fields is not None:
+            return fields
+
+        self._summary_fields = fields = {
             'sequence':        self.sequence,
             'timestamp':       self.timestamp,
             'length':          len(self.data) if self.data is not None else None,
@@ -205,6 +241,7 @@ class ViewSBPacket:
             'summary':         self.summarize(),
             'data_summary':    self.summarize_data()
         }
+        return fields
 
 
     def get_style(self):
@@ -227,8 +264,13 @@ class ViewSBPacket:
         # If we have an existing summary field, return it.
         if self.summary:
             return self.summary
-        else:
-            return self.generate_summary()
+
+        # Otherwise, generate a summary -- once; the packet doesn't change
+        # after analysis, but the UI asks repeatedly while rendering.
+        summary = getattr(self, '_generated_summary', None)
+        if summary is None:
+            self._generated_summary = summary = self.generate_summary()
+        return summary
 
 
     def summarize_data(self, summary_length_bytes=8):
@@ -238,15 +280,23 @@ class ViewSBPacket:
         if not self.data:
             return ""
 
-        # By default, grab a hex representation of the first 32 bytes.
-        summary_hex = binascii.hexlify(self.data[0:summary_length_bytes]).decode('utf-8')
+        # Data summaries are requested with different lengths (the summary row
+        # uses 8 bytes, the detail view 16), so cache per requested length.
+        cache = getattr(self, '_data_summaries', None)
+        if cache is None:
+            cache = self._data_summaries = {}
+        elif summary_length_bytes in cache:
+            return cache[summary_length_bytes]
 
-        # Return the hex data split into byte-pairs.
-        raw_hex = ' '.join(summary_hex[i:i + 2] for i in range(0, len(summary_hex), 2))
+        # By default, grab a hex representation of the first few bytes, already
+        # split into byte-pairs; bytes.hex does this in a single pass.
+        raw_hex = self.data[0:summary_length_bytes].hex(' ')
 
         # Provide an ellipse if the data extends past what we're displaying.
         continuation = '...' if len(self.data) > summary_length_bytes else ''
-        return "{}{}".format(raw_hex, continuation)
+
+        cache[summary_length_bytes] = summary = "{}{}".format(raw_hex, continuation)
+        return summary
 
 
     def summarize_status(self):
@@ -274,7 +324,8 @@ class ViewSBPacket:
         """ Returns a byte-string of raw data, suitable for displaying in a hex inspection field. """
 
         if self.data:
-            return bytes(self.data)
+            # Avoid copying when our data is already an immutable byte string.
+            return self.data if isinstance(self.data, bytes) else bytes(self.data)
         else:
             return b''
 
@@ -284,39 +335,44 @@ class ViewSBPacket:
         """ Returns true iff the given packet's details should be included in its debug output. """
 
 
-    def __repr__(self):
-        """ Provide a quick, console-friendly representation of our data."""
-
-        global print_depth
+    def _describe_into(self, parts, depth):
+        """ Recursive helper for __repr__; appends this packet's description to the parts list. """
 
         summary = self.summarize_data()
 
         if summary:
-            data_summary = " [{}]".format(self.summarize_data())
+            data_summary = " [{}]".format(summary)
         else:
             data_summary = ""
 
         # Quick stab at some nice formatting for console output.
-        description = "<{}: d{}:e{} {}{} {}>".format(
+        parts.append("<{}: d{}:e{} {}{} {}>".format(
             type(self).__name__, self.device_address, self.endpoint_number,
-            self.summarize(), data_summary, self.summarize_status())
+            self.summarize(), data_summary, self.summarize_status()))
+
+        # Indent the block properly for the given print depth.
+        indent = "\t" * (depth + 1)
+        last_subordinate = self.subordinate_packets[-1] if self.subordinate_packets else None
 
-        # Quick hack.
-        print_depth += 1
         for subordinate in self.subordinate_packets:
 
             # If the given subordinate ends the printing block; i.e. it's the last one, or it has a block
             # of subordinates itself that are following, use an angle brace; otherwise, use a tee.
-            ends_group = subordinate is self.subordinate_packets[-1] or subordinate.subordinate_packets
+            ends_group = subordinate is last_subordinate or subordinate.subordinate_packets
             box_char = "┗"  if ends_group else "┣"
 
-            # Indent the block properly for the given print depth.
-            indent = "\t" * print_depth
+            parts.append("\n{}{}━".format(indent, box_char))
+            subordinate._describe_into(parts, depth + 1)
 
-            description += "\n{}{}━{}".format(indent, box_char, subordinate)
-        print_depth -=1
 
-        return description
+    def __repr__(self):
+        """ Provide a quick, console-friendly representation of our data."""
+
+        # Accumulate the description into a list and join it once at the end;
+        # repeated string concatenation would go quadratic on deep transfers.
+        parts = []
+        self._describe_into(parts, 0)
+        return ''.join(parts)
 
 
 class USBPacket(ViewSBPacket):
@@ -336,7 +392,7 @@ class USBPacket(ViewSBPacket):
         elif self.pid.is_data() and self.data is not None and len(self.data) == 0:
             return "zero-length packet"
         else:
-            return "{} packet".format(self.pid.summarize())
+            return f"{self.pid.summarize()} packet"
 
 
     def get_raw_data(self):
@@ -369,10 +425,12 @@ class USBStartOfFrame(USBPacket):
 
     FIELDS = {'frame_number', 'crc5', 'crc_valid'}
 
+    # Compiled once at class-definition time, so parsing skips construct's
+    # interpreter on every packet.
     DATA_FORMAT = BitsSwapped(BitStruct(
         "frame_number"    / BitsInteger(11),
         "crc5"            / BitsInteger(5),
-    ))
+    )).compile()
 
 
     def validate(self):
@@ -382,21 +440,21 @@ class USBStartOfFrame(USBPacket):
 
 
     def generate_summary(self):
-        return "{}".format(self.pid.summarize())
+        return f"{self.pid.summarize()}"
 
 
     def summarize_data(self, summary_length_bytes=8):
         # NOTE: summary_length_bytes is ignored for a token packet.
-        return "frame={}".format(self.frame_number)
+        return f"frame={self.frame_number}"
 
 
     def get_detail_fields(self):
 
         fields = {
-            'Length': '{} bytes'.format(len(self.get_raw_data())),
-            'PID': '{} (0x{:02x})'.format(self.pid.name, self.pid.value),
-            'Frame Number': '{:0d}'.format(self.frame_number),
-            'CRC5': '0x{:02x}'.format(self.crc5)
+            'Length': f'{len(self.get_raw_data())} bytes',
+            'PID': f'{self.pid.name} (0x{self.pid.value:02x})',
+            'Frame Number': f'{self.frame_number:0d}',
+            'CRC5': f'0x{self.crc5:02x}'
         }
 
         return [(self.generate_summary(), fields)]
@@ -404,14 +462,14 @@ class USBStartOfFrame(USBPacket):
 
     def get_raw_data(self):
         # frame number, and crc5 are included in self.data.
-        return b''.join([bytes([self.pid]), self.data])
+        return _pack_byte(self.pid) + self.data
 
 
 class USBStartOfFrameCollection(USBPacket):
     """ Collection of USB SOFs that have been amalgamated for sane display. """
 
     def summarize(self):
-        return "{} start-of-frame markers".format(len(self.subordinate_packets))
+        return f"{len(self.subordinate_packets)} start-of-frame markers"
 
     def summarize_data(self, summary_length_bytes=8):
         return ""
@@ -426,7 +484,7 @@ class USBTokenPacket(USBPacket):
         "device_address"  / BitsInteger(7),
         "endpoint_number" / BitsInteger(4),
         "crc5"            / BitsInteger(5),
-    ))
+    )).compile()
 
 
     def validate(self):
@@ -436,23 +494,25 @@ class USBTokenPacket(USBPacket):
 
 
     def generate_summary(self):
-        return "{} token".format(self.pid.summarize())
+        try:
+            return _TOKEN_SUMMARIES[self.pid]
+        except KeyError:
+            return f"{self.pid.summarize()} token"
 
 
     def summarize_data(self, summary_length_bytes=8):
         # NOTE: summary_length_bytes is ignored for a token packet.
-        return "address={}, endpoint=0x{:02x}, direction={}".format(
-                self.device_address, self.endpoint_number, self.direction)
+        return f"address={self.device_address}, endpoint=0x{self.endpoint_number:02x}, direction={self.direction}"
 
 
     def get_detail_fields(self):
 
         fields = {
-            'Length': '{} bytes'.format(len(self.get_raw_data())),
-            'PID': '{} (0x{:02x})'.format(self.pid.name, self.pid.value),
-            'Device': '0x{:02x}'.format(self.device_address),
-            'Endpoint': '0x{:02x}'.format(self.endpoint_number),
-            'CRC5': '0x{:02x}'.format(self.crc5)
+            'Length': f'{len(self.get_raw_data())} bytes',
+            'PID': f'{self.pid.name} (0x{self.pid.value:02x})',
+            'Device': f'0x{self.device_address:02x}',
+            'Endpoint': f'0x{self.endpoint_number:02x}',
+            'CRC5': f'0x{self.crc5:02x}'
         }
 
         return [(self.generate_summary(), fields)]
@@ -460,7 +520,7 @@ class USBTokenPacket(USBPacket):
 
     def get_raw_data(self):
         # device_address, endpoint, and crc5 are included in self.data.
-        return b''.join([bytes([self.pid]), self.data])
+        return _pack_byte(self.pid) + self.data
 
 
 class USBDataPacket(USBPacket):
@@ -475,7 +535,7 @@ class USBDataPacket(USBPacket):
 
 
     def generate_summary(self):
-        return "{} bytes; {}".format(len(self.data), self.pid.summarize())
+        return f"{len(self.data)} bytes; {self.pid.summarize()}"
 
 
     def summarize_data(self, summary_length_bytes=8):
@@ -489,8 +549,8 @@ class USBDataPacket(USBPacket):
     def get_detail_fields(self):
 
         fields = {
-            'Length': '{} bytes'.format(len(self.get_raw_data())),
-            'PID': '{} (0x{:02x})'.format(self.pid.name, self.pid.value),
+            'Length': f'{len(self.get_raw_data())} bytes',
+            'PID': f'{self.pid.name} (0x{self.pid.value:02x})',
             'Data': self.summarize_data(summary_length_bytes=16),
             'CRC16': '0x{:04x}'.format(int.from_bytes(self.crc16, byteorder='little'))
         }
@@ -499,7 +559,7 @@ class USBDataPacket(USBPacket):
 
 
     def get_raw_data(self):
-        return b''.join([bytes([self.pid]), self.data, self.crc16])
+        return _pack_byte(self.pid) + self.data + self.crc16
 
 
 class USBHandshakePacket(USBPacket):
@@ -512,15 +572,15 @@ class USBHandshakePacket(USBPacket):
     def get_detail_fields(self):
 
         fields = {
-            'Length': '{} bytes'.format(len(self.get_raw_data())),
-            'PID': '{} (0x{:02x})'.format(self.pid.name, self.pid.value)
+            'Length': f'{len(self.get_raw_data())} bytes',
+            'PID': f'{self.pid.name} (0x{self.pid.value:02x})'
         }
 
         return [(self.generate_summary(), fields)]
 
 
     def get_raw_data(self):
-        return bytes([self.pid])
+        return _pack_byte(self.pid)
 
 
 class USBStatusTransfer(USBHandshakePacket):
@@ -548,9 +608,9 @@ class MalformedPacket(USBPacket):
 
     def generate_summary(self):
         if self.pid:
-            return "{} packet; malformed".format(self.pid.summarize())
+            return f"{self.pid.summarize()} packet; malformed"
         else:
-            return "invalid data ({} subpackets)".format(len(self.subordinate_packets))
+            return f"invalid data ({len(self.subordinate_packets)} subpackets)"
 
 
     def summarize_status(self):
@@ -575,13 +635,13 @@ class USBTransaction(ViewSBPacket):
 
     # TODO: representation
 
-    def summarize(self):
-        return "{} transaction".format(self.token.name)
+    def generate_summary(self):
+        return f"{self.token.name} transaction"
 
 
     def summarize_status(self):
         if self.handshake:
-            return "{}{}".format(self.handshake.name, super().summarize_status())
+            return f"{self.handshake.name}{super().summarize_status()}"
 
         else:
             return super().summarize_status()
@@ -603,8 +663,8 @@ class USBTransfer(ViewSBPacket):
     FIELDS = {'pid', 'handshake'}
 
 
-    def summarize(self):
-        return "{}B {} unspecified transfer".format(len(self.data), self.direction.name)
+    def generate_summary(self):
+        return f"{len(self.data)}B {self.direction.name} unspecified transfer"
 
     def validate(self):
         self.parse_field_as_pid('pid',       required=False)
@@ -616,6 +676,8 @@ class USBDataTransaction(USBTransaction):
 
     FIELDS = { 'data_pid', 'handshake'}
 
+    IS_DATA_TRANSACTION = True
+
 
     def validate(self):
         self.parse_field_as_pid('data_pid',  required=False)
@@ -646,11 +708,11 @@ class USBDataTransfer(USBTransaction, USBTransfer):
     FIELDS = {'pid_sequence_ok', 'handshake'}
 
 
-    def summarize(self):
+    def generate_summary(self):
         if self.data:
-            return "{}B {} transfer".format(len(self.data), self.direction.name)
+            return f"{len(self.data)}B {self.direction.name} transfer"
         else:
-            return "data-less {} transfer".format(self.direction.name)
+            return f"data-less {self.direction.name} transfer"
 
 
     def validate(self):
@@ -665,16 +727,16 @@ class USBDataTransfer(USBTransaction, USBTransfer):
         if self.direction is None and self.subordinate_packets:
             self.direction = self.subordinate_packets[0].direction
 
-        # If we don't have a populated data field, populate it.
+        # If we don't have a populated data field, populate it from the data of all
+        # transactions that actually have data. Gathering the chunks and joining
+        # them sizes the result exactly once, where growing a bytearray
+        # transaction-by-transaction would repeatedly reallocate it.
         if self.data is None:
-            self.data = bytearray()
-
-            for packet in self.subordinate_packets:
-
-                # Append the data of all transactions that actually have data to the data of the overall transfer.
-                if isinstance(packet, USBDataTransaction):
-                    if packet.data and packet.handshake == USBPacketID.ACK:
-                        self.data.extend(packet.data)
+            self.data = bytearray(b''.join(
+                packet.data for packet in self.subordinate_packets
+                if packet.IS_DATA_TRANSACTION
+                    and packet.data and packet.handshake == USBPacketID.ACK
+            ))
 
         # TODO: validate PID sequence
 
@@ -688,26 +750,28 @@ class USBTransferFragment(USBTransfer):
     FIELDS = {'transfer_type'}
 
 
-    def summarize(self):
-        return "ORPHANED {}B {}-{} transfer".format(len(self.data), self.direction.name, self.pid.name)
+    def generate_summary(self):
+        return f"ORPHANED {len(self.data)}B {self.direction.name}-{self.pid.name} transfer"
 
 
 class USBBulkTransfer(USBDataTransfer):
 
-    def summarize(self):
-        return "bulk {} transfer ({})".format(self.direction.name, len(self.data))
+    # These override generate_summary rather than summarize, so the base class
+    # caches the formatted string instead of rebuilding it on every render.
+    def generate_summary(self):
+        return f"bulk {self.direction.name} transfer ({len(self.data)})"
 
 
 class USBInterruptTransfer(USBDataTransfer):
 
-    def summarize(self):
-        return "interrupt {} transfer ({})".format(self.direction.name, len(self.data))
+    def generate_summary(self):
+        return f"interrupt {self.direction.name} transfer ({len(self.data)})"
 
 
 class USBIsochronousTransfer(USBDataTransfer):
 
-    def summarize(self):
-        return "isochronous {} transfer ({})".format(self.direction.name, len(self.data))
+    def generate_summary(self):
+        return f"isochronous {self.direction.name} transfer ({len(self.data)})"
 
 
 class USBSetupTransaction(USBTransaction):
@@ -730,7 +794,7 @@ class USBSetupTransaction(USBTransaction):
         "value"             / Bytewise(Int16ul),
         "index"             / Bytewise(Int16ul),
         "request_length"    / Bytewise(Int16ul)
-    )
+    ).compile()
 
 
     def validate(self):
@@ -748,7 +812,7 @@ class USBSetupTransaction(USBTransaction):
         setup_data = bytes(setup_data)
 
         # Break our setup data into its component pieces.
-        request_type_composite, request, value, index, length = struct.unpack("<BBHHH", setup_data)
+        request_type_composite, request, value, index, length = _SETUP_DATA_STRUCT.unpack_from(setup_data)
 
         # Parse the request type bytes.
         direction    = USBDirection.from_request_type(request_type_composite)
@@ -771,13 +835,13 @@ class USBSetupTransaction(USBTransaction):
         return transaction
 
 
-    def summarize(self):
-        return "control request setup transaction for {} request".format(self.request_direction.name)
+    def generate_summary(self):
+        return f"control request setup transaction for {self.request_direction.name} request"
 
 
     def summarize_data(self, summary_length_bytes=8):
         # NOTE: summary_length_bytes is ignored for a SETUP transaction.
-        return "value={:04x} index={:04x} length={:04x}".format(self.value, self.index, self.request_length)
+        return f"value={self.value:04x} index={self.index:04x} length={self.request_length:04x}"
 
 
 class USBSetupTransfer(USBSetupTransaction):
@@ -788,8 +852,8 @@ class USBSetupTransfer(USBSetupTransaction):
     subordinate_packets.
     """
 
-    def summarize(self):
-        return "control request setup transfer for {} request".format(self.request_direction.name)
+    def generate_summary(self):
+        return f"control request setup transfer for {self.request_direction.name} request"
 
 
 class USBControlTransfer(USBTransfer):
@@ -802,14 +866,16 @@ class USBControlTransfer(USBTransfer):
     def from_subordinates(cls, setup_transfer, data_transfer, status_transfer):
         """ Generates a USB Control Transfer packet from its subordinate transfers. """
 
-        fields = {}
-
-        additional_fields = ('sequence', 'timestamp', 'endpoint_number', 'device_address', 'recipient')
-        fields_to_copy_from_setup = cls.FIELDS.union(additional_fields)
+        # Copy each of our local fields from the Setup transaction. The field tuple
+        # and its attrgetter never change, so they're built once and cached on the
+        # class; the attrgetter then fetches all of the fields in a single C call.
+        getter = cls.__dict__.get('_setup_field_getter')
+        if getter is None:
+            additional_fields = ('sequence', 'timestamp', 'endpoint_number', 'device_address', 'recipient')
+            cls._setup_fields = tuple(cls.FIELDS.union(additional_fields))
+            cls._setup_field_getter = getter = operator.attrgetter(*cls._setup_fields)
 
-        # Copy each of our local fields from the Setup transaction.
-        for field in fields_to_copy_from_setup:
-            fields[field] = getattr(setup_transfer, field)
+        fields = dict(zip(cls._setup_fields, getter(setup_transfer)))
 
         # Set the overall direction to the direction indicated in the SETUP transaction.
         fields['direction'] = setup_transfer.request_direction
@@ -848,8 +914,8 @@ class USBControlTransfer(USBTransfer):
             self.style = None
 
 
-    def summarize(self):
-        return "{} {} request #{} to {}".format(self.request_type.name, self.direction.name, self.request_number, self.recipient.name)
+    def generate_summary(self):
+        return f"{self.request_type.name} {self.direction.name} request #{self.request_number} to {self.recipient.name}"
 
 
     def summarize_status(self):